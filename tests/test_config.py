@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from vcit import libvcit
+
+
+class ConfigReadTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'config')
+
+    def read(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        return libvcit.config_read(self.path)
+
+    def test_default_config(self):
+        with open(self.path, 'w') as f:
+            libvcit.repo_default_config().write(f)
+
+        conf = libvcit.config_read(self.path)
+        expected = libvcit.repo_default_config()
+        self.assertEqual(conf, {s: dict(expected[s]) for s in expected.sections()})
+
+    def test_parse(self):
+        conf = self.read('# comment\n'
+                         '; another comment\n'
+                         '\n'
+                         '[core]\n'
+                         '\tRepositoryFormatVersion = 0\n'
+                         '\tbare\n'
+                         '[remote "origin"]\n'
+                         '\turl = https://example.com/a=b\n')
+        self.assertEqual(conf, {
+            'core': {'repositoryformatversion': '0', 'bare': ''},
+            'remote "origin"': {'url': 'https://example.com/a=b'},
+        })
+
+    def test_entry_outside_section(self):
+        with self.assertRaisesRegex(Exception, 'entry outside section'):
+            self.read('bare = false\n[core]\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
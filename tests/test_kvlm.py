@@ -0,0 +1,85 @@
+import collections
+import unittest
+
+from vcit import libvcit
+
+
+COMMIT = (b'tree 29ff16c9c14e2652b22f8b78bb08a5a07930c147\n'
+          b'parent 206941306e8a8af65b66eaaaea388a7ae24d49a0\n'
+          b'parent 306941306e8a8af65b66eaaaea388a7ae24d49a0\n'
+          b'author Thibault Polge <thibault@thb.lt> 1527025023 +0200\n'
+          b'gpgsig -----BEGIN PGP SIGNATURE-----\n'
+          b' \n'
+          b' iQIzBAABCAAdFiEExwXquOM8bWb4Q2zVGxM2FxoLkGQFAlsEjZQACgkQGxM2FxoL\n'
+          b' -----END PGP SIGNATURE-----\n'
+          b'\n'
+          b'Create first draft\n'
+          b'\n'
+          b'body\n')
+
+CASES = [
+    COMMIT,
+    b'tree abc\n\n',
+    b'\nonly a message',
+    COMMIT + b'x' * libvcit._KVLM_JIT_MIN,
+]
+
+# Parse, but don't serialize back to the same bytes
+LENIENT_CASES = [
+    b'tree abc\n',
+]
+
+# Header lines that are neither a field nor the blank line
+MALFORMED_CASES = [
+    b'a b\nnospace\n\nmsg',
+    b'nospace',
+]
+
+
+def parse_py(raw):
+    return libvcit._kvlm_parse_py(raw, 0, collections.OrderedDict())
+
+
+class KvlmTest(unittest.TestCase):
+
+    def test_parse(self):
+        kvlm = libvcit.kvlm_parse(COMMIT)
+        self.assertEqual(kvlm[b'tree'], b'29ff16c9c14e2652b22f8b78bb08a5a07930c147')
+        self.assertEqual(kvlm[b'parent'], [b'206941306e8a8af65b66eaaaea388a7ae24d49a0',
+                                           b'306941306e8a8af65b66eaaaea388a7ae24d49a0'])
+        self.assertEqual(kvlm[b'gpgsig'], b'-----BEGIN PGP SIGNATURE-----\n\n'
+                                          b'iQIzBAABCAAdFiEExwXquOM8bWb4Q2zVGxM2FxoLkGQFAlsEjZQACgkQGxM2FxoL\n'
+                                          b'-----END PGP SIGNATURE-----')
+        self.assertEqual(kvlm[b''], b'Create first draft\n\nbody\n')
+
+    def test_round_trip(self):
+        for raw in CASES:
+            self.assertEqual(libvcit.kvlm_serialize(libvcit.kvlm_parse(raw)), raw)
+
+    def test_header_without_blank_line(self):
+        kvlm = libvcit.kvlm_parse(b'tree abc\n')
+        self.assertEqual(kvlm, {b'tree': b'abc', b'': b''})
+
+    def test_malformed(self):
+        for raw in MALFORMED_CASES:
+            with self.assertRaisesRegex(Exception, 'Malformed commit'):
+                libvcit.kvlm_parse(raw)
+
+    def test_jit_parity(self):
+        # The numba scanner is only exercised here, so it goes unchecked
+        # unless numba is installed.
+        scan_kvlm = libvcit._kvlm_scanner()
+        if scan_kvlm is None:
+            self.skipTest('numba is not installed')
+
+        for raw in CASES + LENIENT_CASES:
+            jit = libvcit._kvlm_parse_jit(raw, 0, collections.OrderedDict(), scan_kvlm)
+            self.assertEqual(jit, parse_py(raw))
+
+        for raw in MALFORMED_CASES:
+            with self.assertRaisesRegex(Exception, 'Malformed commit'):
+                libvcit._kvlm_parse_jit(raw, 0, collections.OrderedDict(), scan_kvlm)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+from vcit import libvcit
+
+
+COMMIT = (b'tree 29ff16c9c14e2652b22f8b78bb08a5a07930c147\n'
+          b'author Thibault Polge <thibault@thb.lt> 1527025023 +0200\n'
+          b'\n'
+          b'Create first draft\n')
+
+
+class RepoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.repo = libvcit.repo_create(os.path.join(tmp.name, 'repo'))
+
+    def write(self, cls, data):
+        return libvcit.object_write(cls(self.repo, data))
+
+    def write_raw(self, sha, raw):
+        """Store raw as the inflated contents of object sha"""
+        path = libvcit.repo_file(self.repo, 'objects', sha[0:2], sha[2:], mkdir=True)
+        with open(path, 'wb') as f:
+            f.write(raw)
+
+
+class ObjectCacheTest(RepoTestCase):
+
+    def remove(self, sha):
+        os.remove(libvcit.repo_path(self.repo, 'objects', sha[0:2], sha[2:]))
+
+    def test_commit_is_cached(self):
+        sha = self.write(libvcit.GitCommit, COMMIT)
+        first = libvcit.object_read(self.repo, sha)
+        self.remove(sha)
+
+        second = libvcit.object_read(self.repo, sha)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.kvlm, first.kvlm)
+
+    def test_blob_is_not_cached(self):
+        sha = self.write(libvcit.GitBlob, b'hello\n')
+        libvcit.object_read(self.repo, sha)
+        self.remove(sha)
+
+        with self.assertRaises(FileNotFoundError):
+            libvcit.object_read(self.repo, sha)
+
+    def test_eviction(self):
+        size = libvcit._OBJECT_CACHE_SIZE
+        libvcit._OBJECT_CACHE_SIZE = 2
+        self.addCleanup(setattr, libvcit, '_OBJECT_CACHE_SIZE', size)
+        libvcit._object_cache.clear()
+
+        shas = [self.write(libvcit.GitCommit, COMMIT + b'%d\n' % i) for i in range(3)]
+        for sha in shas:
+            libvcit.object_read(self.repo, sha)
+            self.remove(sha)
+
+        with self.assertRaises(FileNotFoundError):
+            libvcit.object_read(self.repo, shas[0])
+        for sha in shas[1:]:
+            libvcit.object_read(self.repo, sha)
+
+
+class ObjectStatTest(RepoTestCase):
+
+    def test_matches_object_read(self):
+        for cls, data in [(libvcit.GitBlob, b'hello\n'),
+                          (libvcit.GitBlob, os.urandom(200000)),
+                          (libvcit.GitCommit, COMMIT)]:
+            sha = self.write(cls, data)
+            obj = libvcit.object_read(self.repo, sha)
+            self.assertIs(type(obj), cls)
+            self.assertIsInstance(obj.serialize(), bytes)
+            self.assertEqual(libvcit.object_stat(self.repo, sha), (cls.fmt, len(obj.serialize())))
+
+    def test_small_reads(self):
+        sha = self.write(libvcit.GitBlob, os.urandom(1000))
+        chunk = libvcit._STAT_CHUNK
+        libvcit._STAT_CHUNK = 1
+        try:
+            self.assertEqual(libvcit.object_stat(self.repo, sha), (b'blob', 1000))
+        finally:
+            libvcit._STAT_CHUNK = chunk
+
+    def test_malformed(self):
+        cases = [
+            (zlib.compress(b'blob ' + b'1' * 100 + b'\x00'), 'Malformed object'),
+            (zlib.compress(b'blob\x00data'), 'Malformed object'),
+            (zlib.compress(b'blob abc\x00data'), 'Malformed object'),
+            (zlib.compress(b'blob 4'), 'Malformed object'),
+            (b'not zlib at all', 'Malformed object'),
+            (zlib.compress(b'frob 4\x00data'), 'Unknown type'),
+        ]
+        for i, (raw, error) in enumerate(cases):
+            sha = '%040x' % i
+            self.write_raw(sha, raw)
+            with self.assertRaisesRegex(Exception, error):
+                libvcit.object_stat(self.repo, sha)
+
+
+class BatchObjectReadTest(RepoTestCase):
+
+    def test_order_and_duplicates(self):
+        count = 2 * (os.cpu_count() or 1) + 5
+        shas = [self.write(libvcit.GitBlob, b'blob %d\n' % i) for i in range(count)]
+        shas += shas[:3] + shas[::-1]
+
+        got = list(libvcit.batch_object_read(self.repo, iter(shas)))
+
+        self.assertEqual([sha for sha, obj in got], shas)
+        for sha, obj in got:
+            self.assertEqual(obj.blobdata, libvcit.object_read(self.repo, sha).blobdata)
+
+    def test_cache_hits_and_misses(self):
+        commits = [self.write(libvcit.GitCommit, COMMIT + b'%d\n' % i) for i in range(6)]
+        blob = self.write(libvcit.GitBlob, b'hello\n')
+
+        # warm the cache for every other commit, then drop their files so
+        # only the cache can serve them
+        expected = {}
+        for sha in commits:
+            expected[sha] = libvcit.object_read(self.repo, sha).serialize()
+        libvcit._object_cache.clear()
+        for sha in commits[::2]:
+            libvcit.object_read(self.repo, sha)
+            os.remove(libvcit.repo_path(self.repo, 'objects', sha[0:2], sha[2:]))
+
+        shas = commits + [blob] + commits
+        got = list(libvcit.batch_object_read(self.repo, shas))
+
+        self.assertEqual([sha for sha, obj in got], shas)
+        for sha, obj in got[:len(commits)]:
+            self.assertEqual(obj.serialize(), expected[sha])
+        self.assertEqual(got[len(commits)][1].blobdata, b'hello\n')
+
+    def test_error_reaches_consumer(self):
+        good = self.write(libvcit.GitBlob, b'hello\n')
+        bad = '%040x' % 0
+        self.write_raw(bad, b'not zlib at all')
+
+        got = []
+        with self.assertRaises(Exception):
+            for sha, obj in libvcit.batch_object_read(self.repo, [good, bad, good]):
+                got.append(sha)
+        self.assertEqual(got, [good])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,31 +1,8 @@
-import argparse
 import collections
-import configparser
-import hashlib
+import functools
 from math import ceil
 import os
-import re
 import sys
-import zlib
-
-
-argparser = argparse.ArgumentParser(description='vcit - a simple version control system')
-argsubparsers = argparser.add_subparsers(title='Command', dest='command', help='command to run', required=True)
-
-# init
-argsp = argsubparsers.add_parser('init', help='Initialize a new, empty repository.')
-argsp.add_argument('path', metavar='directory', nargs='?', default='.', help='Where to create the repository.')
-
-# cat-file
-argsp = argsubparsers.add_parser('cat-file', help='Provide content of repository objects')
-argsp.add_argument('type', metavar='type', choices=['blob', 'commit', 'tag', 'tree'], help='Specify the type')
-argsp.add_argument('object', metavar='object', help='The object to display')
-
-# hash-object
-argsp = argsubparsers.add_parser('hash-object', help='Compute object ID and optionally creates a blob from a file')
-argsp.add_argument('-t', metavar='type', dest='type', choices=['blob', 'commit', 'tag', 'tree'], default='blob', help='Specify the type')
-argsp.add_argument('-w', dest='write', action='store_true', help='Actually write the object into the database')
-argsp.add_argument('path', help='Read object from <file>')
 
 
 class GitRepository:
@@ -39,20 +16,26 @@ class GitRepository:
         self.worktree = path
         self.gitdir = os.path.join(path, '.git')
 
+        # gitdir resolved once, used to key the object cache
+        self._abs_gitdir = os.path.abspath(self.gitdir)
+
+        # objects/xx fanout directories known to exist
+        self._created_fanout = set()
+
         if not (force or os.path.isdir(self.gitdir)):
             raise Exception('Not a Git repository %s' % path)
 
         # Read configuration file
-        self.conf = configparser.ConfigParser()
+        self.conf = {}
         cf = repo_file(self, 'config')
 
         if cf and os.path.exists(cf):
-            self.conf.read([cf])
+            self.conf = config_read(cf)
         elif not force:
             raise Exception('Configuration file missing')
 
         if not force:
-            vers = int(self.conf.get('core', 'repositoryformatversion'))
+            vers = int(self.conf['core']['repositoryformatversion'])
             if vers != 0:
                 raise Exception('Unsupported repositoryformatversion %s' % vers)
 
@@ -125,26 +108,51 @@ def repo_create(path):
 def repo_find(path='.', required=True):
     path = os.path.realpath(path)
 
-    if os.path.realpath(os.path.join(path, '.git')):
-        return GitRepository(path)
+    while True:
+        if os.path.isdir(os.path.join(path, '.git')):
+            return GitRepository(path)
 
-    parent = os.path.realpath(os.path.join(path, '..'))
+        parent = os.path.dirname(path)
 
-    if parent == path:
-        # Bottom case
-        # os.path.join('/', '..') == '/'.
-        # If parent==path, then path is root.
+        if parent == path:
+            # Bottom case
+            # os.path.dirname('/') == '/'.
+            # If parent==path, then path is root.
 
-        if required:
-            raise Exception('No git repository.')
-        else:
-            return None
+            if required:
+                raise Exception('No git repository.')
+            else:
+                return None
+
+        path = parent
+
+
+def config_read(path):
+    """Read the INI-style git config at path into a dict of sections, each a
+    dict of key to value. Keys are lowercased, like configparser does."""
+    conf = {}
+    section = None
+
+    with open(path) as f:
+        for line in f.read().splitlines():
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
 
-    # recursion
-    return repo_find(parent, required)
+            if line[0] == '[' and line[-1] == ']':
+                section = conf.setdefault(line[1:-1].strip(), {})
+            elif section is None:
+                raise Exception('Malformed config %s: entry outside section' % path)
+            else:
+                k, _, v = line.partition('=')
+                section[k.strip().lower()] = v.strip()
+
+    return conf
 
 
 def repo_default_config():
+    import configparser
+
     ret = configparser.ConfigParser()
 
     ret.add_section('core')
@@ -163,7 +171,7 @@ class GitObject:
     Then followed content of the file
     """
 
-    repo = None
+    __slots__ = ('repo',)
 
     def __init__(self, repo, data=None):
         self.repo = repo
@@ -180,6 +188,7 @@ class GitObject:
 
 
 class GitCommit(GitObject):
+    __slots__ = ('kvlm',)
     fmt = b'commit'
 
     def deserialize(self, data):
@@ -190,14 +199,15 @@ class GitCommit(GitObject):
 
 
 class GitTree(GitObject):
-    pass
+    __slots__ = ()
 
 
 class GitTag(GitObject):
-    pass
+    __slots__ = ()
 
 
 class GitBlob(GitObject):
+    __slots__ = ('blobdata',)
     fmt = b'blob'
 
     def serialize(self):
@@ -207,6 +217,40 @@ class GitBlob(GitObject):
         self.blobdata = data
 
 
+# Object constructors by header type
+_OBJ_TYPES = {
+    b'commit': GitCommit,
+    b'tree': GitTree,
+    b'tag': GitTag,
+    b'blob': GitBlob,
+}
+
+# Upper bound for the "<fmt> <size>\x00" object header
+_HEADER_MAX = 64
+
+# Read size used by object_stat while looking for the header
+_STAT_CHUNK = 4096
+
+# Chunk size used when streaming object data through zlib
+_WRITE_CHUNK = 1 << 20
+
+# Objects up to this size are compressed with the fast zlib level
+_SMALL_OBJECT = 16 << 10
+
+# Object files from this size on are mmapped rather than read
+_MMAP_MIN = 64 << 10
+
+# Inputs from this size on are parsed with the numba scanner, if installed
+_KVLM_JIT_MIN = 64 << 10
+
+# Error for a header line that is neither a field nor the blank line
+_KVLM_MALFORMED = 'Malformed commit: header line without a space'
+
+# Parsed non-blob objects by (absolute gitdir, sha), least recently used first
+_object_cache = collections.OrderedDict()
+_OBJECT_CACHE_SIZE = 4096
+
+
 def object_find(repo, name, fmt=None, follow=True):
     return name
 
@@ -215,52 +259,245 @@ def object_read(repo, sha):
     """Read object object_id from Git repository repo. Return a GitObject whose
     exact type depends on the object."""
 
+    key = (repo._abs_gitdir, sha)
+    hit = _object_cache_get(key)
+
+    if hit is None:
+        path = os.path.join(key[0], 'objects', sha[0:2], sha[2:])
+        hit = _object_parse(_object_inflate(path), sha)
+        _object_cache_put(key, hit)
+
+    # Call constructor and return object
+    c, data = hit
+    return c(repo, data)
+
+
+def _object_cache_get(key):
+    """Return the cached (constructor, data) for key, an
+    (absolute gitdir, sha) pair, or None."""
+    hit = _object_cache.get(key)
+    if hit is not None:
+        _object_cache.move_to_end(key)
+    return hit
+
+
+def _object_cache_put(key, hit):
+    """Cache the (constructor, data) pair hit under key, evicting the least
+    recently used entries beyond _OBJECT_CACHE_SIZE.
+
+    Only trees, commits and tags are cached: traversals re-read those, while
+    blobs can be arbitrarily large. Objects are content-addressed, so
+    entries never go stale. A fresh GitObject is built from an entry on every
+    read, so callers can't mutate each other's objects."""
+    if hit[0] is GitBlob:
+        return
+
+    _object_cache[key] = hit
+    if len(_object_cache) > _OBJECT_CACHE_SIZE:
+        _object_cache.popitem(last=False)
+
+
+def _object_inflate(path):
+    """Return the inflated contents of the object file at path.
+
+    Uses a bare file descriptor rather than open() to skip the buffered io
+    layer, and hints the kernel that the file is read sequentially. Files of
+    _MMAP_MIN bytes or more are mapped and handed to zlib directly, saving
+    the copy into a bytes object."""
+    import mmap
+    import zlib
+
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        size = os.fstat(fd).st_size
+        if size >= _MMAP_MIN:
+            with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+                return zlib.decompress(mm)
+
+        chunks = []
+        while size > 0:
+            chunk = os.read(fd, size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+    finally:
+        os.close(fd)
+
+    return zlib.decompress(chunks[0] if len(chunks) == 1 else b''.join(chunks))
+
+
+def _object_parse(raw, sha):
+    """Parse the header of inflated object raw. Return the constructor and
+    the object data."""
+
+    # Header is "<fmt> <size>\x00" and never longer than a few dozen bytes,
+    # so bound the scan instead of walking the whole object.
+    y = raw.find(b'\x00', 0, _HEADER_MAX)
+    fmt, c, size = _object_header(raw, y, sha)
+
+    # Validate object size
+    if size != len(raw)-y-1:
+        raise Exception('Malformed object {0}: bad length'.format(sha))
+
+    return c, raw[y+1:]
+
+
+def _object_header(raw, y, sha):
+    """Parse the "<fmt> <size>" header that ends at offset y of raw (-1 if
+    no NUL was found). Return (fmt, constructor, size)."""
+    x = raw.find(b' ', 0, y)
+    if y < 0 or x < 0:
+        raise Exception('Malformed object {0}: bad header'.format(sha))
+
+    fmt = raw[0:x]
+
+    # Read object size
+    try:
+        size = int(raw[x+1:y])
+    except ValueError:
+        raise Exception('Malformed object {0}: bad header'.format(sha))
+
+    # Pick constructor
+    try:
+        c = _OBJ_TYPES[fmt]
+    except KeyError:
+        raise Exception('Unknown type {0} for object {1}'.format(fmt.decode('ascii', 'replace'), sha))
+
+    return fmt, c, size
+
+
+def object_stat(repo, sha):
+    """Return (fmt, size) of object sha without inflating all of it. Only
+    enough of the stream to cover the header is decompressed."""
+    import zlib
+
     path = repo_path(repo, 'objects', sha[0:2], sha[2:])
+    d = zlib.decompressobj()
+    out = b''
 
     with open(path, 'rb') as f:
-        raw = zlib.decompress(f.read())
-
-        # Read object type
-        x = raw.find(b' ')
-        fmt = raw[0:x]
-
-        # Read and validate object size
-        y = raw.find(b'\x00', x)
-        size = int(raw[x:y].decode('ascii'))
-        if size != len(raw)-y-1:
-            raise Exception('Malformed object {0}: bad length'.format(sha))
-
-        # Pick constructor
-        if fmt == b'commit' : c=GitCommit
-        elif fmt == b'tree' : c=GitTree
-        elif fmt == b'tag'  : c=GitTag
-        elif fmt == b'blob' : c=GitBlob
-        else:
-            raise Exception('Unknown type %s for object %s'.format(fmt.decode('ascii'), sha))
-
-        # Call constructor and return object
-        return c(repo, raw[y+1:])
+        try:
+            while True:
+                y = out.find(b'\x00')
+                if y >= 0:
+                    break
+
+                buf = d.unconsumed_tail or f.read(_STAT_CHUNK)
+                if not buf or len(out) >= _HEADER_MAX:
+                    raise Exception('Malformed object {0}: bad header'.format(sha))
+
+                out += d.decompress(buf, _HEADER_MAX - len(out))
+        except zlib.error:
+            raise Exception('Malformed object {0}: bad compression'.format(sha))
+
+    fmt, c, size = _object_header(out, y, sha)
+    return fmt, size
+
+
+def batch_object_read(repo, shas):
+    """Read objects shas from repo, inflating them on a thread pool. Yield
+    (sha, GitObject) pairs in the order of shas.
+
+    zlib releases the GIL while inflating, so this scales with cores when
+    reading many objects. shas may be a lazy iterable: at most a small
+    window of reads is in flight at a time. Reads go through the same
+    object cache as object_read."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    gitdir = repo._abs_gitdir
+    workers = os.cpu_count() or 1
+    window = collections.deque()
+
+    def read(sha):
+        path = os.path.join(gitdir, 'objects', sha[0:2], sha[2:])
+        return _object_inflate(path)
+
+    def finish():
+        sha, key, hit, future = window.popleft()
+        if hit is None:
+            hit = _object_parse(future.result(), sha)
+            _object_cache_put(key, hit)
+        c, data = hit
+        return sha, c(repo, data)
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for sha in shas:
+            key = (gitdir, sha)
+            hit = _object_cache_get(key)
+            future = ex.submit(read, sha) if hit is None else None
+            window.append((sha, key, hit, future))
+
+            if len(window) >= 2 * workers:
+                yield finish()
+
+        while window:
+            yield finish()
+
+
+def _zlib_level(size):
+    """Compression level for an object of size bytes. VCIT_ZLIB_LEVEL
+    overrides; otherwise small objects use the fast level 1 and larger ones
+    zlib's default."""
+    level = os.environ.get('VCIT_ZLIB_LEVEL')
+    if level is not None:
+        try:
+            n = int(level)
+        except ValueError:
+            n = None
+        if n is None or not -1 <= n <= 9:
+            raise Exception('VCIT_ZLIB_LEVEL must be an integer from -1 to 9, got %r' % level)
+        return n
+
+    return 1 if size <= _SMALL_OBJECT else 6
 
 
 def object_write(obj, actually_write=True):
     """Write object to the Git repository repo. Return the object's sha."""
+    import hashlib
+    import zlib
 
     # Serialize object data
     data = obj.serialize()
 
-    # Add header
-    result = obj.fmt + b' ' + str(len(data)).encode() + b'\x00' + data
-
-    # Compute hash
-    sha = hashlib.sha1(result).hexdigest()
-
+    # Resolve compression level up front so a bad setting fails early
     if actually_write:
-        # Compute path
-        path = repo_file(obj.repo, 'objects', sha[0:2], sha[2:], mkdir=actually_write)
+        level = _zlib_level(len(data))
+
+    # Build header; it is hashed and compressed separately from data so the
+    # full object is never materialized in memory.
+    header = b'%s %d\x00' % (obj.fmt, len(data))
+
+    # Compute hash; object ids aren't a security boundary, so let the hash
+    # skip FIPS gating where supported (Python 3.9+)
+    try:
+        h = hashlib.sha1(usedforsecurity=False)
+    except TypeError:
+        h = hashlib.sha1()
+    h.update(header)
+    h.update(data)
+    sha = h.hexdigest()
 
-        # Write to file
+    if actually_write:
+        # Compute path, creating the fanout directory only once per repo
+        repo = obj.repo
+        fanout = os.path.join(repo.gitdir, 'objects', sha[0:2])
+        if sha[0:2] not in repo._created_fanout:
+            os.makedirs(fanout, exist_ok=True)
+            repo._created_fanout.add(sha[0:2])
+        path = os.path.join(fanout, sha[2:])
+
+        # Stream compressed object to file
+        co = zlib.compressobj(level)
+        view = memoryview(data)
         with open(path, 'wb') as f:
-            f.write(zlib.compress(result))
+            f.write(co.compress(header))
+            for i in range(0, len(view), _WRITE_CHUNK):
+                f.write(co.compress(view[i:i+_WRITE_CHUNK]))
+            f.write(co.flush())
 
     return sha
 
@@ -288,49 +525,146 @@ def object_hash(fd, fmt, repo=None):
     return object_write(obj, repo)
 
 
+@functools.lru_cache(maxsize=None)
+def _kvlm_scanner():
+    """Compile the kvlm field scanner with numba on first use. Return None if
+    numba is not installed."""
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return None
+
+    @njit(cache=True)
+    def scan(buf, start):
+        """Scan kvlm fields from uint8 array buf. Return (spans, count, msg)
+        where each of the first count rows of spans holds
+        (key_start, key_end, value_start, value_end) and msg is the offset
+        of the message, or -1 if a header line has no space."""
+        n = buf.shape[0]
+        spans = np.empty((16, 4), np.int64)
+        count = 0
+        i = start
+
+        while True:
+            # search next space or new line
+            spc = i
+            while spc < n and buf[spc] != 0x20 and buf[spc] != 0x0a:
+                spc += 1
+
+            # a blank line (or the end) starts the message; any other line
+            # without a space is malformed
+            if spc >= n or buf[spc] == 0x0a:
+                if spc != i:
+                    return spans, count, -1
+                return spans, count, spc + 1
+
+            # find end of value, continuation lines start with a space
+            end = spc + 1
+            while True:
+                while end < n and buf[end] != 0x0a:
+                    end += 1
+                if end + 1 >= n or buf[end+1] != 0x20:
+                    break
+                end += 1
+
+            if count == spans.shape[0]:
+                grown = np.empty((count * 2, 4), np.int64)
+                grown[:count] = spans
+                spans = grown
+
+            spans[count, 0] = i
+            spans[count, 1] = spc
+            spans[count, 2] = spc + 1
+            spans[count, 3] = end
+            count += 1
+
+            i = end + 1
+
+    def scan_kvlm(raw, start):
+        spans, count, msg = scan(np.frombuffer(raw, dtype=np.uint8), start)
+        return spans[:count].tolist(), msg
+
+    return scan_kvlm
+
+
+def _kvlm_set(dct, key, value):
+    """Store value under key, collecting repeated keys into a list"""
+    # don't override existing value
+    if key in dct:
+        if type(dct[key]) == list:
+            dct[key].append(value)
+        else:
+            dct[key] = [dct[key], value]
+    else:
+        dct[key] = value
+
+
 def kvlm_parse(raw, start=0, dct=None):
     """key-value list and message parser"""
     if not dct:
         dct = collections.OrderedDict()
 
-    # search next space and new line
-    spc = raw.find(b' ', start)
-    nl = raw.find(b'\n', start)
+    # JIT-compiled scan only pays for importing numba on large inputs
+    if len(raw) - start >= _KVLM_JIT_MIN:
+        scan_kvlm = _kvlm_scanner()
+        if scan_kvlm is not None:
+            return _kvlm_parse_jit(raw, start, dct, scan_kvlm)
 
-    # if newline is the first or there is no space, then
-    # remains message
-    if (spc < 0) or (nl < spc):
-        assert(nl == start)
-        dct[b''] = raw[start+1:]
-        return dct
+    return _kvlm_parse_py(raw, start, dct)
 
-    # parse key values recursive
-    key = raw[start:spc]
 
-    end = start
-    while True:
-        end = raw.find(b'\n', end+1)
-        if raw[end+1] != ord(' '):
-            break
+def _kvlm_parse_jit(raw, start, dct, scan_kvlm):
+    """kvlm_parse using the numba scanner scan_kvlm"""
+    mv = memoryview(raw)
+    spans, msg = scan_kvlm(raw, start)
+    if msg < 0:
+        raise Exception(_KVLM_MALFORMED)
 
-    # grab the value and remove leading spaces
-    value = raw[spc+1, end].replace(b'\n ', b' ')
+    for ks, ke, vs, ve in spans:
+        _kvlm_set(dct, bytes(mv[ks:ke]), bytes(mv[vs:ve]).replace(b'\n ', b'\n'))
+    dct[b''] = bytes(mv[msg:])
+    return dct
 
-    # don't override existing value
-    if key in dict:
-        if type(dct[key]) == list:
-            dct[key].append(value)
-        else:
-            dct[key] = [dct[key], value]
+
+def _kvlm_parse_py(raw, start, dct):
+    """kvlm_parse in pure Python"""
+    # fields end at the first blank line, the rest is the message
+    if raw.startswith(b'\n', start):
+        header, msg = b'', raw[start+1:]
     else:
-        dct[key] = value
+        header, _, msg = raw[start:].partition(b'\n\n')
+
+    lines = header.split(b'\n') if header else []
+
+    # no blank line: a header ending in a newline leaves an empty last line
+    if lines and not lines[-1]:
+        lines.pop()
 
-    return kvlm_parse(raw, start=end+1, dct=dct)
+    i = 0
+
+    while i < len(lines):
+        # continuation lines start with a space
+        j = i + 1
+        while j < len(lines) and lines[j][:1] == b' ':
+            j += 1
+
+        # split key from value and drop the continuation spaces
+        joined = b'\n'.join(lines[i:j])
+        spc = joined.find(b' ')
+        if spc < 0:
+            raise Exception(_KVLM_MALFORMED)
+        _kvlm_set(dct, joined[:spc], joined[spc+1:].replace(b'\n ', b'\n'))
+
+        i = j
+
+    dct[b''] = msg
+    return dct
 
 
 def kvlm_serialize(kvlm):
     """key-value list and message serializer"""
-    ret = b''
+    buf = bytearray()
 
     # output fields
     for k in kvlm.keys():
@@ -344,12 +678,16 @@ def kvlm_serialize(kvlm):
             val = [val]
 
         for v in val:
-            ret += k + b' ' + (v.replace(b'\n', b'\n ')) + b'\n'
+            buf += k
+            buf += b' '
+            buf += v.replace(b'\n', b'\n ')
+            buf += b'\n'
 
     # append message
-    ret += b'\n' + kvlm[b'']
+    buf += b'\n'
+    buf += kvlm[b'']
 
-    return ret
+    return bytes(buf)
 
 
 def cmd_add(args):
@@ -420,21 +758,72 @@ def cmd_tag(args):
     pass
 
 
+def _argparser_init(argsubparsers):
+    argsp = argsubparsers.add_parser('init', help='Initialize a new, empty repository.')
+    argsp.add_argument('path', metavar='directory', nargs='?', default='.', help='Where to create the repository.')
+
+
+def _argparser_cat_file(argsubparsers):
+    argsp = argsubparsers.add_parser('cat-file', help='Provide content of repository objects')
+    argsp.add_argument('type', metavar='type', choices=['blob', 'commit', 'tag', 'tree'], help='Specify the type')
+    argsp.add_argument('object', metavar='object', help='The object to display')
+
+
+def _argparser_hash_object(argsubparsers):
+    argsp = argsubparsers.add_parser('hash-object', help='Compute object ID and optionally creates a blob from a file')
+    argsp.add_argument('-t', metavar='type', dest='type', choices=['blob', 'commit', 'tag', 'tree'], default='blob', help='Specify the type')
+    argsp.add_argument('-w', dest='write', action='store_true', help='Actually write the object into the database')
+    argsp.add_argument('path', help='Read object from <file>')
+
+
+_SUBPARSERS = {
+    'init': _argparser_init,
+    'cat-file': _argparser_cat_file,
+    'hash-object': _argparser_hash_object,
+}
+
+
+def _build_argparser(argv):
+    """Build the command line parser for argv. Done on demand so that
+    importing libvcit as a library doesn't pay for argparse. Only the
+    subparser of the requested command is added; all of them are added
+    when argv doesn't start with a known command, so help and errors still
+    list every command."""
+    import argparse
+
+    argparser = argparse.ArgumentParser(description='vcit - a simple version control system')
+    argsubparsers = argparser.add_subparsers(title='Command', dest='command', help='command to run', required=True)
+
+    if argv and argv[0] in _SUBPARSERS:
+        # still name every command in the top-level usage line
+        argsubparsers.metavar = '{%s}' % ','.join(_SUBPARSERS)
+        _SUBPARSERS[argv[0]](argsubparsers)
+    else:
+        for add_parser in _SUBPARSERS.values():
+            add_parser(argsubparsers)
+
+    return argparser
+
+
+_COMMANDS = {
+    'add': cmd_add,
+    'cat-file': cmd_cat_file,
+    'checkout': cmd_checkout,
+    'commit': cmd_commit,
+    'hash-object': cmd_hash_object,
+    'init': cmd_init,
+    'log': cmd_log,
+    'ls-files': cmd_ls_files,
+    'ls-tree': cmd_ls_tree,
+    'merge': cmd_merge,
+    'rebase': cmd_rebase,
+    'rev-parse': cmd_rev_parse,
+    'rm': cmd_rm,
+    'show-ref': cmd_show_ref,
+    'tag': cmd_tag,
+}
+
+
 def main(argv=sys.argv[1:]):
-    args = argparser.parse_args(argv)
-
-    if   args.command == 'add'          : cmd_add(args)
-    elif args.command == 'cat-file'     : cmd_cat_file(args)
-    elif args.command == 'checkout'     : cmd_checkout(args)
-    elif args.command == 'commit'       : cmd_commit(args)
-    elif args.command == 'hash-object'  : cmd_hash_object(args)
-    elif args.command == 'init'         : cmd_init(args)
-    elif args.command == 'log'          : cmd_log(args)
-    elif args.command == 'ls-files'     : cmd_ls_files(args)
-    elif args.command == 'ls-tree'      : cmd_ls_tree(args)
-    elif args.command == 'merge'        : cmd_merge(args)
-    elif args.command == 'rebase'       : cmd_rebase(args)
-    elif args.command == 'rev-parse'    : cmd_rev_parse(args)
-    elif args.command == 'rm'           : cmd_rm(args)
-    elif args.command == 'show-ref'     : cmd_show_ref(args)
-    elif args.command == 'tag'          : cmd_tag(args)
+    args = _build_argparser(argv).parse_args(argv)
+    _COMMANDS[args.command](args)